@@ -24,6 +24,7 @@ class BCR2k(Device):
 
         self.output, self.outname = open_port_by_name("BCR", "output")
         self.input, self.inname = open_port_by_name("BCR", "input")
+        self.listen_to_input()
 
         if auto_start:
             self.start()
@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 from util import clip, eprint
 
 
@@ -34,11 +36,15 @@ class Control(object):
     """
 
     # Designate which attributes of the Control can be configured by the user
-    # and provide some defaults
-    default_conf = {"minval": 0,
-                    "maxval": 127,
-                    "blink": False,
-                    }
+    # and provide some defaults. Read-only, as it is shared by every View (see View.configure)
+    default_conf = MappingProxyType({"minval": 0,
+                                     "maxval": 127,
+                                     "blink": False,
+                                     })
+
+    # Whether setting a value the Control already has leaves it unchanged. Only then
+    # may repeated values be dropped before they reach the Control.
+    idempotent = True
 
     def __init__(self, ID, parent=None, minval=0, maxval=127, blink=False):
         self.ID = ID
@@ -84,8 +90,7 @@ class Control(object):
 def controls_to_IDs(controls):
     return [c.ID for c in controls]
 
-buttonconf = Control.default_conf
-buttonconf.update({"toggle": True})
+buttonconf = MappingProxyType(dict(Control.default_conf, toggle=True))
 
 class Button(Control):
     """
@@ -100,6 +105,9 @@ class Button(Control):
     # @TODO: This is hacky, make it more straightforward
     default_conf = buttonconf
 
+    # Each value sent can advance the toggle cycle
+    idempotent = False
+
     def __init__(self, ID, parent=None, toggle=True, **kwargs):
         super().__init__(ID, parent, **kwargs)
         self.toggle = toggle
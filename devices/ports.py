@@ -1,10 +1,11 @@
 import time
 
 from enum import Enum
-from queue import Full
+from queue import Full, Empty
 from threading import Thread
 
 import rtmidi
+from wrapt import synchronized
 from rtmidi.midiconstants import CONTROL_CHANGE, SONG_START, SONG_CONTINUE, SONG_STOP, TIMING_CLOCK
 from rtmidi.midiutil import open_midioutput, open_midiport, open_midiinput, get_api_from_environment, \
     list_output_ports, list_input_ports
@@ -53,6 +54,23 @@ def select_port(port_type="input"):
     return int(input())
 
 
+def put_dropping_oldest(q, item):
+    """
+    Puts the item on the queue without blocking. Should the queue be full, the
+    oldest items are dropped to make room: if the listener can't keep up, the
+    latest control values matter more than the ones it missed.
+    """
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except Full:
+            try:
+                q.get_nowait()
+            except Empty:
+                pass
+
+
 def ccc2ID(channel, cc, page=0, device_number=0):
     """
     Turns a combination of channel and cc into a Control ID.
@@ -99,17 +117,23 @@ class Port(object):
 
     def __init__(self, name="Unnamed Port", interactive=False, auto_start=True):
         self.name = name
+
+        # Whether rtmidi hands us incoming messages through a callback (see listen_to_input)
+        # or whether update() has to poll the input port for them
+        self.listening = False
+
+        # Listeners to this Device register Queue objects to be informed of Events
+        self.listener_qs = set()
+
         if interactive:
             self.output, self.outname = open_midioutput(select_port("output"))
             self.input, self.inname = open_midiinput(select_port("input"))
+            self.listen_to_input()
 
         # The port's main_loop is supposed to run in its own thread. It is only started if
         # the object is constructed with auto_start = True or if the start method is called
         self.thread = Thread(target=self.main_loop, daemon=True)
 
-        # Listeners to this Device register Queue objects to be informed of Events
-        self.listener_qs = set()
-
         if auto_start:
             if not (self.input and self.output):
                 print("Could not start the Device thread without any input or output configured")
@@ -131,6 +155,28 @@ class Port(object):
         except KeyError:
             eprint("(Exception): Tried to remove Queue that wasn't registered:", q)
 
+    def listen_to_input(self):
+        """
+        Let rtmidi call input_callback from its own thread as soon as a message arrives
+        instead of waiting for the next update() to poll the input port. Call this once
+        the input port has been opened. Messages arriving before a listener was added
+        are dropped, the port isn't wired up to anything yet (see _midi_callback).
+        """
+        self.input.set_callback(self._midi_callback)
+        self.listening = True
+
+    def _midi_callback(self, event, data=None):
+        # Nothing attached yet, e.g. an OutputPort without its Interface's clock
+        if not self.listener_qs:
+            return
+        try:
+            self.input_callback(event)
+        except Exception as e:
+            eprint(self, e)
+
+    def input_callback(self, event):
+        pass
+
     def start(self):
         """
         Start the main_loop of this device in its own thread
@@ -241,6 +287,7 @@ class Device(Port):
         """
         return control.ID in range(self.page * 16 * 128, (self.page + 1) * 16 * 128)
 
+    @synchronized
     def cc(self, ID, value, ignore_page=False):
         """
         Send a CC message to the device's midi port. The ID will be transformed
@@ -265,8 +312,8 @@ class Device(Port):
         - Handle midi events from the input port
         - Update the blinking on the device
         """
-        # Handle midi events
-        while True:
+        # Handle midi events, unless rtmidi already delivers them through the callback
+        while not self.listening:
             event = self.input.get_message()
             if event:
                 self.input_callback(event)
@@ -281,6 +328,7 @@ class Device(Port):
                 self.cc(control.ID, self.blink_state * control.maxval)
             self.last_blink = t
 
+    @synchronized
     def set_control(self, ID, value, from_input=False, inform_listeners=False, force=False):
         """
         Try to set the value of a control. Depending on the flags the value is reported back to:
@@ -298,6 +346,9 @@ class Device(Port):
                for actions like recalling previous values and bringing the control back
                into that state.
 
+        Controls are only ever set while holding the Device's lock since input from the
+        hardware can arrive on rtmidi's callback thread (see listen_to_input).
+
         Default assumption: We call this from the outside, which means we only really
         want to set the control value on the hardware and not get the set value reported
         back to us, which might result in an endless loop of messages. Hence the defaults
@@ -338,6 +389,7 @@ class Device(Port):
 
         return real_value
 
+    @synchronized
     def input_callback(self, event):
         """
         Handles a Midi event from the input device.
@@ -362,10 +414,7 @@ class Device(Port):
         """
 
         for listener in self.listener_qs:
-            try:
-                listener.put_nowait((DeviceEvent.CC, self, ID, value))
-            except Full:
-                print(listener, "is full")
+            put_dropping_oldest(listener, (DeviceEvent.CC, self, ID, value))
 
 
 class OutputEvent(Enum):
@@ -381,16 +430,16 @@ class OutputPort(Port):
 
     def __init__(self, *args, **kwargs):
         self.last_sent_values = {}
+        self.clock = None
         super().__init__(*args, **kwargs)
         self.input.ignore_types(timing=False)
 
-        self.clock = None
-
     def update(self):
-        # Handle midi events
-        event = self.input.get_message()
-        if event:
-            self.input_callback(event)
+        # Handle midi events, unless rtmidi already delivers them through the callback
+        if not self.listening:
+            event = self.input.get_message()
+            if event:
+                self.input_callback(event)
 
     def cc(self, channel, cc, value):
         """
@@ -406,6 +455,7 @@ class OutputPort(Port):
         """
         Handles a Midi event from the DAW
         """
+        received = time.monotonic()
         message, deltatime = event
 
         status_byte = message[0]
@@ -416,11 +466,12 @@ class OutputPort(Port):
         elif status_byte == SONG_STOP:
             self.clock.stop()
         elif status_byte == TIMING_CLOCK:
-            self.clock.tick()
+            self.clock.tick(received)
 
         else:  # TODO: Filter for Note events
             try:
-                channel, cc, value = message
+                channel_byte, cc, value = message
+                channel = (channel_byte - CONTROL_CHANGE) + 1
                 ID = ccc2ID(channel, cc)
 
                 worth_reporting = False
@@ -444,8 +495,5 @@ class OutputPort(Port):
 
     def inform_listeners(self, *data):
         for listener in self.listener_qs:
-            try:
-                listener.put_nowait(data)
-            except Full:
-                print(listener, "is full")
+            put_dropping_oldest(listener, data)
 
@@ -6,6 +6,7 @@ class VirtualMidi(OutputPort):
         self.input, self.inname = open_port_by_name("daw_to_smci", "input")
         self.output, self.outname = open_port_by_name("smci_to_daw", "output")
         super().__init__("VirtualMidi", *args, **kwargs)
+        self.listen_to_input()
 
         self.ignore_daw = kwargs.get("ignore_daw", False)
 
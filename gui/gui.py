@@ -5,14 +5,13 @@ Feel free to work on a GUI for this script if you'd find it useful.
 """
 import sys
 import time
-import itertools
 import argparse
 from threading import Lock
 from collections import namedtuple
 
 from PyQt5.QtWidgets import QWidget, QGridLayout, QPushButton, QApplication, QHBoxLayout, QVBoxLayout, QLabel, QComboBox, QListWidget, QLineEdit, QAction, QMenuBar, QMainWindow, QSlider
-from PyQt5.QtGui import QImage, QPixmap, QFont, QPalette, QBrush, QColor
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import Qt, QTimer, pyqtSlot
 
 from interface import Interface, View, load_profile, save_profile
 from devices import BCR2k, MidiLoop
@@ -21,8 +20,25 @@ import devices
 
 Vector2 = namedtuple("Vector2", ["x", "y"])
 
+
+def set_button(button, value):
+    """
+    Presses or releases the button and switches its "state" property, which
+    selects the matching rule of the Editor's stylesheet. Nothing is repolished
+    if the state doesn't change.
+    """
+    button.setDown(bool(value))
+    state = "on" if value else "off"
+    if button.property("state") == state:
+        return
+    button.setProperty("state", state)
+    # Dynamic properties are only picked up by the stylesheet after a repolish
+    button.style().unpolish(button)
+    button.style().polish(button)
+
+
 setters = {QSlider: QSlider.setValue,
-           QPushButton: QPushButton.setDown
+           QPushButton: set_button
           }
 
 
@@ -70,7 +86,7 @@ class Controller(object):
         we need route through the interface instead of manipulating the
         targets directly.
         """
-        targets = self.interface.view.map[ID]
+        targets = self.interface.view.map.get(ID, ())
         self.interface.trigger_targets(self, targets, value)
 
 
@@ -80,8 +96,18 @@ class Editor(QMainWindow):
     """
     position = Vector2(-950, 250)
     size = Vector2(850, 700)
+    cell_size = Vector2(80, 30)  # Minimum size of a control's cell in the grid
     title = "Smart BCR2k Editor - Dev Edition"
 
+    # Parsed once for the whole window instead of styling every control widget
+    # on its own. Widgets change their looks through dynamic properties.
+    stylesheet = """
+        QPushButton[state="on"] { background: #f80; }
+        QPushButton[state="off"] { background: #444; }
+        QSlider::groove:horizontal { height: 6px; background: #444; }
+        QSlider::handle:horizontal { width: 10px; margin: -4px 0; background: #f80; }
+    """
+
     def __init__(self, interface=None, controller=None):
         super().__init__()
         self.UI_initialized = False
@@ -141,6 +167,10 @@ class Editor(QMainWindow):
         self.view_selector = QListWidget()
         self.view_selector.addItems((view.name for view in self.interface.views))
         self.view_selector.setCurrentRow(self.interface.views.index(self.interface.view))
+        # Map view names to their items so reflecting the active view needs no scan
+        self.view_items = {self.view_selector.item(index).text(): self.view_selector.item(index)
+                           for index in range(self.view_selector.count())}
+        self.current_view_name = self.interface.view.name
         self.view_selector.itemClicked.connect(self.view_changed)
         self.view_selector.setMinimumWidth(100)
         self.view_layout.addWidget(self.view_selector)
@@ -184,36 +214,45 @@ class Editor(QMainWindow):
             sld = QSlider(Qt.Horizontal, self)
             sld.setMaximum(127)
             #sld.setFocusPolicy(Qt.NoFocus)
-            sld.sliderMoved.connect(lambda value: self.value_changed(ID, value))
+            sld.setProperty("control_id", ID)
+            sld.sliderMoved.connect(self.dial_moved)
             return sld
 
         def create_button(control):
             ID = control.ID
             button = QPushButton(str(control))
             button.setCheckable(True)
-            button.clicked[bool].connect(lambda value: self.value_changed(ID, value))
+            button.setProperty("state", "off")
+            button.setProperty("control_id", ID)
+            button.clicked[bool].connect(self.button_clicked)
             return button
 
         factory = {devices.Dial: create_dial,
                    devices.Button: create_button,
                   }
 
-        self.control_widgets = {}  # Map control IDs to Widgets
+        self.grid = grid
+        self.widget_factory = factory
+        # Control IDs are small ints, so we index plain lists by them
+        max_ID = max(bcr.controls, default=-1)
+        self.control_widgets = [None] * (max_ID + 1)  # ID -> Widget
+        # Widgets are only constructed once their control is shown. Until then
+        # we only remember where in the grid they go.
+        self.control_slots = [None] * (max_ID + 1)  # ID -> (control, row, col)
 
         def make_groups(grid, controls, Widget, start_row=0, start_col=0):
             row = 0
             col = 0
             for row, group in enumerate(controls, start=start_row):
                 for col, control in enumerate(group, start=start_col):
-                    w = factory[type(control)](control)
-                    grid.addWidget(w, row, col)
-                    self.control_widgets[control.ID] = w
+                    if control is None:
+                        continue
+                    self.control_slots[control.ID] = (control, row, col)
             return row + 1, col + 1
 
         def make_group(grid, controls, Widget, length, start_row=0, start_col=0):
-            args = [iter(controls)] * length
-            l = (itertools.zip_longest(*args))
-            return make_groups(grid, l, Widget, start_row=start_row, start_col=start_col)
+            groups = [controls[i:i + length] for i in range(0, len(controls), length)]
+            return make_groups(grid, groups, Widget, start_row=start_row, start_col=start_col)
 
         # Macro Dials
         row, _ = make_groups(grid, bcr.macros, None, row) 
@@ -228,9 +267,18 @@ class Editor(QMainWindow):
         row, _ = make_group(grid, bcr.command_buttons, QPushButton, 2, row-2, rowlen+1)
 
         # End input device specific stuff
-        grid_container = QWidget()
-        grid_container.setLayout(grid)
-        self.layout.addWidget(grid_container)
+
+        # Reserve the space of every cell up front. Widgets are added lazily and
+        # shouldn't make the grid reflow when they show up.
+        slots = [slot for slot in self.control_slots if slot is not None]
+        for r in range(max((row for _, row, _ in slots), default=-1) + 1):
+            grid.setRowMinimumHeight(r, self.cell_size.y)
+        for c in range(max((col for _, _, col in slots), default=-1) + 1):
+            grid.setColumnMinimumWidth(c, self.cell_size.x)
+
+        self.grid_container = QWidget()
+        self.grid_container.setLayout(grid)
+        self.layout.addWidget(self.grid_container)
 
         #self.setLayout(self.layout)
 
@@ -250,6 +298,7 @@ class Editor(QMainWindow):
             return
 
         self.setWindowTitle(self.title)
+        self.setStyleSheet(self.stylesheet)
         self.resize(self.size.x, self.size.y)
         self.move(self.position.x, self.position.y)
         
@@ -264,7 +313,7 @@ class Editor(QMainWindow):
         """
         try:
             changes = self.interface.get_recent_changes().get() # Returns a promise
-            for ID, value in changes["controls"].items():
+            for ID, value in changes["controls"].drain():
                 self.reflect(ID, value)
 
             with self.locks["views"]:
@@ -272,23 +321,67 @@ class Editor(QMainWindow):
         finally:
             QTimer.singleShot(50, self.update_editor)
 
+    def ensure_widget(self, ID):
+        """
+        Returns the widget of the control with the given ID, constructing it
+        and putting it into the grid on first use. None if the control has no
+        place in the grid. A widget constructed for a control the current view
+        doesn't map keeps its place in the layout but is hidden.
+        """
+        widget = self.control_widgets[ID]
+        if widget is not None:
+            return widget
+
+        slot = self.control_slots[ID]
+        if slot is None:
+            return None
+
+        control, row, col = slot
+        widget = self.widget_factory[type(control)](control)
+        # Hidden widgets keep their cell so the grid doesn't shift between views
+        policy = widget.sizePolicy()
+        policy.setRetainSizeWhenHidden(True)
+        widget.setSizePolicy(policy)
+        widget.setVisible(bool(self.interface.view.map.get(ID)))
+        self.grid.addWidget(widget, row, col)
+        self.control_widgets[ID] = widget
+        return widget
+
     def reflect(self, ID, value):
         """
-        Reflects the value of a control to the widget representing it.
+        Reflects the value of a control to the widget representing it. Widgets
+        are only constructed for controls mapped in the current view, others are
+        updated if they already exist.
         """
-        try:
+        if self.interface.view.map.get(ID):
+            widget = self.ensure_widget(ID)
+        else:
             widget = self.control_widgets[ID]
-            setters[type(widget)](widget, value)
-        except KeyError:
+        if widget is None:
             return
+        setters[type(widget)](widget, value)
 
     def reflect_all(self, view):
         """
-        Reflects all target values of the view on their respective widgets
+        Reflects all target values of the view on their respective widgets.
+        Widgets of controls the view doesn't map keep their place in the
+        layout but are hidden.
         """
-        for ID in self.control_widgets:
-            value = self.interface.input.controls[ID].get_value()
-            self.reflect(ID, value)
+        # Don't repaint for every widget we construct or touch on the way
+        self.grid_container.setUpdatesEnabled(False)
+        try:
+            for ID, widget in enumerate(self.control_widgets):
+                if widget is None:
+                    continue
+                widget.setVisible(bool(view.map.get(ID)))
+
+            for ID, targets in view.map.items():
+                if not targets:
+                    continue
+                value = self.interface.input.controls[ID].get_value()
+                self.reflect(ID, value)
+        finally:
+            self.grid_container.setUpdatesEnabled(True)
             
     def reflect_views(self, all_views, active_view):
         """
@@ -300,12 +393,19 @@ class Editor(QMainWindow):
 
         # @TODO: Shit's flickering
         # Reflect current View in the general UI
-        if active_view.name != self.view_selector.currentItem().text():
-            for index in range(self.view_selector.count()):
-                item = self.view_selector.item(index)
-                if item.text() == active_view.name:
-                    self.view_selector.setCurrentItem(item)
-                    break
+        if active_view.name == self.current_view_name:
+            return
+
+        item = self.view_items.get(active_view.name)
+        if item is None:
+            # The view was added to the selector after the map was built
+            items = self.view_selector.findItems(active_view.name, Qt.MatchExactly)
+            if items:
+                item = self.view_items[active_view.name] = items[0]
+        if item is not None:
+            self.view_selector.setCurrentItem(item)
+        self.current_view_name = active_view.name
+        self.reflect_all(active_view)
 
 
 
@@ -315,6 +415,16 @@ class Editor(QMainWindow):
         view_name = item.text()
         with self.locks["views"]:
             self.interface.switch_to_view(view_name).get()  # Forces blocking
+            self.current_view_name = view_name
+            self.reflect_all(self.interface.view)
+
+    @pyqtSlot(int)
+    def dial_moved(self, value):
+        self.value_changed(self.sender().property("control_id"), value)
+
+    @pyqtSlot(bool)
+    def button_clicked(self, value):
+        self.value_changed(self.sender().property("control_id"), value)
 
     def value_changed(self, ID, value):
         """
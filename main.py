@@ -7,6 +7,7 @@ from devices import BCR2k, VirtualMidi
 from smci.interface import *
 from smci.view import View
 from util.interactive import interact
+from util.threadshell import yield_thread
 
 
 parser = argparse.ArgumentParser(description='Run the commandline interface')
@@ -9,7 +9,7 @@ You can add a dictionary called "comment" to your script that will be included a
 back whenever the profile is loaded later.
 """
 import argparse
-import importlib
+import importlib.util
 import os.path
 
 from devices import BCR2k, VirtualMidi
@@ -31,14 +31,18 @@ if __name__ == "__main__":
         outfilename = "%s.bcr" % args.script
     outfilename = os.path.join(PROFILES_DIR, outfilename)
 
+    # Load the script straight from its file, before any midi ports are opened
+    script = os.path.join(PROFILES_DIR, "%s.py" % args.script)
+    spec = importlib.util.spec_from_file_location(args.script, script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
     # Instantiate the objects that will be configured by the script
     bcr = BCR2k(auto_start=False)
     loop = VirtualMidi(auto_start=False)
     interface = Interface(bcr, loop)
 
-    # Load the script and execute the creat function
-    script = "%s.%s" % (PROFILES_DIR, args.script)
-    module = importlib.import_module(script)
+    # Execute the script's create function
     module.create(interface)
 
     # Fetch optional comment dictionary
@@ -30,7 +30,7 @@ For musically synced frequencies, calculate the frequency to set using the bpm_s
 function which receives the bpm and the number of quarter notes per cycle.
 """
 from fractions import Fraction
-from math import sin, cos, pi
+from math import sin, cos, tau
 from random import random
 
 from util import eprint, iprint
@@ -51,6 +51,12 @@ def bpm_sync(bpm, quarter_notes):
 
 
 class LFO(object):
+    # LFOs are created for every Basic modifier and wave runs on every tick
+    __slots__ = ()
+
+    # Whether one instance can serve all Basic modifiers. Set to False if wave keeps state.
+    shared = True
+
     def wave(self, t, positive=False):
         """
         t in [0, 1), which is one cycle. Implement in such a way that:
@@ -61,14 +67,18 @@ class LFO(object):
 
 
 class Sine(LFO):
+    __slots__ = ()
+
     def wave(self, t, positive=False):
         if positive:
-            return (sin(t * 2 * pi) + 1) / 2
+            return sin(t * tau) * 0.5 + 0.5
         else:
-            return -cos(t * 2 * pi)
+            return -cos(t * tau)
 
 
 class Saw(LFO):
+    __slots__ = ()
+
     def wave(self, t, positive=False):
         if positive:
             return t
@@ -77,6 +87,8 @@ class Saw(LFO):
 
 
 class Triangle(LFO):
+    __slots__ = ()
+
     def wave(self, t, positive=False):
         if positive:
             if t < 0.5:
@@ -93,16 +105,24 @@ class Triangle(LFO):
 
 
 class Square(LFO):
+    __slots__ = ()
+
     def wave(self, t, positive=False):
+        # Bools add and multiply as ints
         if positive:
-            return int(t < 0.25 or t > 0.75)
+            return (t < 0.25) + (t > 0.75)
         else:
-            return int(t < 0.5) * 2 - 1
+            return (t < 0.5) * 2 - 1
 
 
 class SampledRandom(LFO):
-    last_t = 0
-    current_value = 0
+    __slots__ = ("last_t", "current_value")
+    shared = False
+
+    def __init__(self):
+        self.last_t = 0
+        self.current_value = 0
+
     def wave(self, t, positive=False):
         if t <= self.last_t:
             if positive:
@@ -118,11 +138,10 @@ class SampledRandom(LFO):
 
 # We list them explicitly instead of gathering them from locals() to define an order
 LFOs = [Sine, Saw, Triangle, Square, SampledRandom]
-def pick_lfo_from_list(lfo, lfos):
-    return next(filter(lambda l: type(l) == lfo, lfos))
-
-def pick_lfo_from_list_by_name(name, lfos):
-    return next(filter(lambda l: type(l).__name__ == name, lfos))
+SHARED_LFOS = {L: L() for L in LFOs if L.shared}
+# LFO name -> index, used by Basic to switch LFOs by name (e.g. when loading).
+# Every Basic's lfos tuple is ordered like LFOs, so the index is the same everywhere
+LFO_INDICES = {L.__name__: index for index, L in enumerate(LFOs)}
 
 
 SYNC_STEPS = [Fraction(x) for x in ('8', '4', '2', '1', '1/2', '1/4', '1/8', '1/16', '1/32')]
@@ -167,8 +186,10 @@ class Basic(Modifier):
 
         self.positive = positive
         self.offset = offset
-        self.lfos = [L() for L in LFOs]
-        self._lfo = pick_lfo_from_list(init_lfo, self.lfos)
+        self.lfos = tuple(SHARED_LFOS[L] if L.shared else L() for L in LFOs)
+        self._lfo_index = LFO_INDICES[init_lfo.__name__]
+        self._lfo = self.lfos[self._lfo_index]
+        self._wave = self._lfo.wave  # Bound once, calculate runs on every tick
 
         # Variables for keeping in sync with the clock
         # TODO: When changing synced value, calculate frequency from frequency_synced and vice versa
@@ -187,16 +208,17 @@ class Basic(Modifier):
         """
 
         if self.synced:
-            wrapped_prog = time_report.prog % self.frequency_synced
+            length = self.sync_length
+            wrapped_prog = time_report.prog % length
             #iprint(self.name == "LFOSine", self.frequency_synced, self.sync_segment, time_report.prog, wrapped_prog, self.last_prog)
             if wrapped_prog <= self.last_prog:
-                self.sync_segment = (self.sync_segment + 1) % self.frequency_synced
+                self.sync_segment = (self.sync_segment + 1) % self.sync_segments
 
-            t = (self.sync_segment + wrapped_prog) / self.frequency_synced
+            t = (self.sync_segment + wrapped_prog) / length
             self.last_prog = wrapped_prog
         else:
-            self.free_t += self.frequency * time_report.delta
-            t = self.free_t
+            # Keep the phase within one cycle, a growing free_t would lose precision over time
+            t = self.free_t = (self.free_t + self.frequency * time_report.delta) % 1
 
         t = (t + self.offset) % 1
 
@@ -206,7 +228,20 @@ class Basic(Modifier):
         # However, it wouldn't allow full range modulation in centered
         # mode. It feels better, but makes the centered mode less useful.
         # * (1 + int(self.positive)) / 2
-        return self._lfo.wave(t, self.positive)
+        return self._wave(t, self.positive)
+
+    @property
+    def frequency_synced(self):
+        return self._frequency_synced
+
+    @frequency_synced.setter
+    def frequency_synced(self, f):
+        self._frequency_synced = f
+        # calculate works with the float, Fraction arithmetic is too slow for every tick.
+        # The SYNC_STEPS are all powers of two, exact as floats.
+        self.sync_length = float(f)
+        # A cycle spans this many whole measures, counted by the int sync_segment
+        self.sync_segments = max(1, int(f))
 
     @property
     def freq_sync(self):
@@ -221,7 +256,7 @@ class Basic(Modifier):
 
     @property
     def lfo(self):
-        return self.lfos.index(self._lfo)
+        return self._lfo_index
 
     @lfo.setter
     def lfo(self, value):
@@ -250,7 +285,7 @@ class Basic(Modifier):
         self.frequency = m["frequency"]
         self.positive = m["positive"]
         self.offset = m["offset"]
-        self.lfo = self.lfos.index(pick_lfo_from_list_by_name(m["lfo"], self.lfos))
+        self.lfo = LFO_INDICES[m["lfo"]]
 
     def save(self):
         d = super().save()
@@ -265,7 +300,7 @@ class Basic(Modifier):
         self.frequency = d["frequency"]
         self.positive = d["positive"]
         self.offset = d["offset"]
-        self.lfo = self.lfos.index(pick_lfo_from_list_by_name(d["lfo"], self.lfos))
+        self.lfo = LFO_INDICES[d["lfo"]]
 
     def switch_to_lfo(self, index):
         """
@@ -277,5 +312,8 @@ class Basic(Modifier):
             self._lfo = self.lfos[index]
         except IndexError:
             eprint("No LFO in slot", index)
+        else:
+            self._lfo_index = index % len(self.lfos)  # Negative indices count from the end
+            self._wave = self._lfo.wave
 
 
@@ -1,5 +1,3 @@
-from collections import defaultdict as ddict
-
 from util import eprint, clip
 from util.attribute_mapping import AttributeType, AttributeDescriptor, Configurable
 
@@ -26,7 +24,7 @@ class Modifier(Configurable):
         self._amplitude = amplitude  # The maximum value the Modifier will take on
         self._value = 0.0  # The actual current value of the Modifier at any given time
 
-        self.targets = ddict(lambda: 0.0)  # target object -> [-1, 1]
+        self.targets = {}  # target object -> [-1, 1], targets with power 0 are removed
 
     def serialize(self):
         """
@@ -58,13 +56,11 @@ class Modifier(Configurable):
         Expects a target object and a power in the range [-1, 1]. The Modifier will then
         start modifying that target.
         """
-        if float(power) == 0.0:
-            try:
-                del self.targets[target]
-            except KeyError:
-                pass
+        power = float(power)
+        if power == 0.0:
+            self.targets.pop(target, None)
         else:
-            self.targets[target] = float(power)
+            self.targets[target] = power
 
     def remove_target(self, target):
         """
@@ -80,11 +76,14 @@ class Modifier(Configurable):
         """
         Removes all targets from this modifier
         """
-        for target in self.targets:
-            self.remove_target(target)
-
-        # Better safe than sorry
+        # remove_target would delete from self.targets while we iterate over it
+        targets = list(self.targets)
         self.targets.clear()
+        for target in targets:
+            try:
+                target.remove_modifier(self)
+            except AttributeError as e:
+                eprint(e)
 
     @property
     def amplitude(self):
@@ -102,19 +101,27 @@ class Modifier(Configurable):
         """
         Returns the current value multiplied by the amplitude. Use this to modify things.
         """
-        return self.value * self.amplitude
+        return self._value * self._amplitude
 
-    def tick(self, time_report):
+    def tick(self, time_report, modified=None):
         """
-        Calculates a new modifier value and applies it to all its targets
+        Calculates a new modifier value and applies it to all its targets.
+
+        If a dict is passed as modified, the targets are not triggered. Instead they
+        are collected in modified (target -> modifier) to be triggered by the caller,
+        which then only has to trigger a target once no matter how many modifiers it has.
         """
         self._value = self.calculate(time_report)
         modvalue = self.modvalue()
+        trigger = modified is None
         for target, power in self.targets.items():
             try:
-                target.modify(self, modvalue * power)
+                target.modify(self, modvalue * power, trigger)
             except AttributeError as e:
                 eprint(e)
+                continue
+            if not trigger:
+                modified[target] = self
 
         return modvalue
 
@@ -139,7 +146,7 @@ class Modifier(Configurable):
         """
         self._value = d["_value"]
         self._amplitude = d["_amplitude"]
-        self.targets = ddict(lambda: 0.0)
+        self.targets = {}
         for t_name, value in d["targets"].items():
             target = i.targets[t_name]
             self.targets[target] = value
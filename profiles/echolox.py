@@ -1,3 +1,5 @@
+from itertools import islice
+
 import util
 
 from smci import View
@@ -47,10 +49,13 @@ def map_controls_to_targets(view, controls, targets):
         for control, target in zip(controls, targets):
             view.map_this(control.ID, target)
 
-def configure_controls(view, controls, attribute, value):
-    """ In the provided view, configures the list of controls by setting the attribute to the provided value. """
-    for control in controls:
-        view.configuration[control.ID][attribute] = value
+def map_and_configure(view, controls, targets, **attributes):
+    """ Maps the list of controls to the list of targets and configures the mapped controls with the attributes. """
+    IDs = []
+    for control, target in zip(controls, targets):
+        view.map_this(control.ID, target)
+        IDs.append(control.ID)
+    view.configure_all(IDs, **attributes)
 
 
 # @MOVE: This out into util or something
@@ -62,8 +67,8 @@ def ccc(channel=0, cc=0, forbidden=None):
     :param cc: 
     :return: 
     """
-    if forbidden is None:
-        forbidden = []
+    # Checked for every cc we step over
+    forbidden = set(forbidden) if forbidden else set()
 
     while channel <= 16:
         yield channel, cc
@@ -97,6 +102,11 @@ def create(interface):
     bcr = i.input._o
     # Macro dials. Get each bank using [i] with i in [0, 1, 2, 3]
     macros = bcr.macros
+    # The buttons of the first macro bank and the two rows of menu buttons. We need them for every view.
+    macro_buttons = bcr.macro_bank_buttons(0)
+    menu_rows = [bcr.menu_rows(0), bcr.menu_rows(1)]
+    # Main dials by column
+    dialsc = bcr.dialsc
 
     # The initial View that is active on startup
     view_init = i.view
@@ -113,7 +123,7 @@ def create(interface):
     span refers to settings that can hold a value within a certain interval (typically 0-1 or 0-127)
     """
     # Use the second row of buttons
-    i.add_to_universal_controls(AttributeType.boolean, bcr.menu_rows(1))
+    i.add_to_universal_controls(AttributeType.boolean, menu_rows[1])
     # All the dials, starting in the top left and going row by row
     i.add_to_universal_controls(AttributeType.span, bcr.dials)
 
@@ -136,7 +146,7 @@ def create(interface):
         view = ModView("%s_ModView" % name, interface, lfo)
         interface.add_modifier(lfo)
         interface.view.map_this(button.ID, view)
-        interface.view.configuration[button.ID]["toggle"] = False
+        interface.view.configure(button.ID, toggle=False)
         return lfo, view
 
     lfos, lfo_views = [], []
@@ -150,7 +160,7 @@ def create(interface):
     steps_view = ModView("StepSequencer_ModView", i, steps)
     i.add_modifier(steps)
     view_init.map_this(bcr.command_buttons[3].ID, steps_view)
-    view_init.configuration[bcr.command_buttons[3].ID]["toggle"] = False
+    view_init.configure(bcr.command_buttons[3].ID, toggle=False)
 
 
     """ GLOBAL PAGEFLIP
@@ -165,7 +175,7 @@ def create(interface):
     global_pageflip = PageFlip("Global Pageflip", i, bcr)
     pageflip_button = bcr.function_buttons[2]
     view_init.map_this(pageflip_button.ID, global_pageflip)
-    view_init.configuration[pageflip_button.ID]["toggle"] = True
+    view_init.configure(pageflip_button.ID, toggle=True)
 
 
     """ MACRO BANKS ###
@@ -189,8 +199,7 @@ def create(interface):
     flex_setters = [FlexSetter("FlexSetter_%i" % index, i, flex) for index, flex in enumerate(flex_params, start=1)]
 
     map_controls_to_targets(view_init, bcr.macro_bank(0),         [snpsel] + flex_params)
-    map_controls_to_targets(view_init, bcr.macro_bank_buttons(0), [snpset] + flex_setters)
-    configure_controls(view_init, bcr.macro_bank_buttons(0), "toggle", False)
+    map_and_configure(view_init, macro_buttons, [snpset] + flex_setters, toggle=False)
 
     # Collect all the Targets that the BCR2k's macros are mapped to, starting with the ones we already did
     macro_dial_targets = [snpsel] + flex_params
@@ -218,7 +227,7 @@ def create(interface):
         i.quick_parameter(dial.ID)
 
     bpm = BPM("BPM", i)
-    view_init.map_this(bcr.dialsc[0][2].ID, bpm)
+    view_init.map_this(dialsc[0][2].ID, bpm)
 
 
     """ MENU BUTTONS: Let's get complicated!
@@ -248,11 +257,8 @@ def create(interface):
     switch_to_init =  SwitchView("To_INIT",               i, view_init)
 
     # Distribute them on the Init View
-    map_controls_to_targets(view_init, bcr.menu_rows(0), switch_tracks)
-    configure_controls(view_init, bcr.menu_rows(0), "toggle", False)
-
-    map_controls_to_targets(view_init, bcr.menu_rows(1), switch_fx)
-    configure_controls(view_init, bcr.menu_rows(1), "toggle", False)
+    map_and_configure(view_init, menu_rows[0], switch_tracks, toggle=False)
+    map_and_configure(view_init, menu_rows[1], switch_fx, toggle=False)
 
 
     ### FOR ALL OF THE FOLLOWING VIEWS
@@ -268,22 +274,16 @@ def create(interface):
         ##        or at least a subset of views.
 
         # Macros
-        for dial, target in zip(bcr.macros, macro_dial_targets):
+        for dial, target in zip(macros, macro_dial_targets):
             view.map_this(dial.ID, target)
-        for mbutton, target in zip(bcr.macro_bank_buttons(0), macro_button_targets):
-            view.map_this(mbutton.ID, target)
-            view.configuration[mbutton.ID]["toggle"] = False
+        map_and_configure(view, macro_buttons, macro_button_targets, toggle=False)
 
         # Command Buttons:
         view.map_this(pageflip_button.ID, global_pageflip)
-        view.configuration[pageflip_button.ID]["toggle"] = True
+        view.configure(pageflip_button.ID, toggle=True)
 
         # Modifiers
-        map_controls_to_targets(view, bcr.command_buttons, lfo_views)
-        configure_controls(view, bcr.command_buttons, "toggle", False)
-
-        view.map_this(bcr.command_buttons[3].ID, steps_view)
-        view.configuration[bcr.command_buttons[3].ID]["toggle"] = False
+        map_and_configure(view, bcr.command_buttons, lfo_views + [steps_view], toggle=False)
     ### END GLOBAL STUFF
 
 
@@ -292,10 +292,10 @@ def create(interface):
 
     # Create a generator that will yield the next combination of Channel and CC Value for us
     gen = ccc(channel=i.parameter_maker.channel, cc=i.parameter_maker.next_cc, forbidden=i.parameter_maker.forbidden)
-    gen_n = lambda n: [next(gen) for _ in range(n)]
+    gen_n = lambda n: list(islice(gen, n))
 
     # We want to move through the dials by column, but do so in one big list
-    dials = util.flatten(bcr.dialsc)
+    dials = util.flatten(dialsc)
 
     # Now let's iterate per Track
     for track_index in range(8):
@@ -306,37 +306,40 @@ def create(interface):
 
         # First Row Buttons: Switch To View
         index = 0
-        for button, target in zip(bcr.menu_rows(0), switch_tracks):
-            view.configuration[button.ID]["toggle"] = False
+        for button, target in zip(menu_rows[0], switch_tracks):
+            view.configure(button.ID, toggle=False)
             if index != track_index:
                 view.map_this(button.ID, target)
             else:
                 view.map_this(button.ID, switch_to_init)
-                view.configuration[button.ID]["blink"] = True
+                view.configure(button.ID, blink=True)
             index += 1
 
+        # Every track takes 8 CCs for the effects activators and 48 for the effects parameters
+        track_ccs = gen_n(8 + 48)
+
         # Second Row Buttons: Effects activators
         fx_onoff = []
-        for index, (channel, cc) in enumerate(gen_n(8), start=1):
+        for index, (channel, cc) in enumerate(track_ccs[:8], start=1):
             p = Parameter("T%i_FX%i_OnOff" % (track_index + 1, index), i, channel, cc, is_button=True)
             fx_onoff.append(p)
-        map_controls_to_targets(view, bcr.menu_rows(1), fx_onoff)
+        map_controls_to_targets(view, menu_rows[1], fx_onoff)
         # SPECIAL CASE: Stutter and Repeater momentary
         # @TODO: Move this somewhere else for easier configuration
-        view.configuration[bcr.menu_rows(1)[4].ID]["toggle"] = False
-        view.configuration[bcr.menu_rows(1)[6].ID]["toggle"] = False
+        view.configure(menu_rows[1][4].ID, toggle=False)
+        view.configure(menu_rows[1][6].ID, toggle=False)
 
         # Effects parameters
         fx_params = []
         subparam_index = 0
-        for index, (channel, cc) in enumerate(gen_n(48), start=1):
+        for index, (channel, cc) in enumerate(track_ccs[8:], start=1):
             p = Parameter("T%i_FX%i_%i" % (track_index + 1, (index - 1) / 6 + 1, subparam_index + 1), i, channel, cc)
             fx_params.append(p)
 
             subparam_index = (subparam_index + 1) % 6
         map_controls_to_targets(view, dials, fx_params)
 
-        i.views.append(view)
+        i.add_view(view)
     # END PER TRACK VIEW
 
     # Now we'll iterate per FX. The Parameters already exist, we just need to cherry-pick them
@@ -345,25 +348,25 @@ def create(interface):
         controls_for_all(view)
 
         fx_index = 0
-        for button, target in zip(bcr.menu_rows(1), switch_fx):
-            view.configuration[button.ID]["toggle"] = False
+        for button, target in zip(menu_rows[1], switch_fx):
+            view.configure(button.ID, toggle=False)
             if fx_index != index:
                 view.map_this(button.ID, target)
             else:
                 view.map_this(button.ID, switch_to_init)
-                view.configuration[button.ID]["blink"] = True
+                view.configure(button.ID, blink=True)
             fx_index += 1
 
         for track, t_view in enumerate(views_tracks):
-            onoff = t_view.map[bcr.menu_rows(1)[index].ID][0] 
-            params = [t_view.map[d.ID][0] for d in bcr.dialsc[index]]
+            onoff = next(iter(t_view.map[menu_rows[1][index].ID]))
+            params = [next(iter(t_view.map[d.ID])) for d in dialsc[index]]
 
-            view.map_this(bcr.menu_rows(0)[track].ID, onoff)
+            view.map_this(menu_rows[0][track].ID, onoff)
             if index in (4, 6):
-                view.configuration[bcr.menu_rows(0)[track].ID]["toggle"] = False
+                view.configure(menu_rows[0][track].ID, toggle=False)
 
             for subparam, p in enumerate(params):
-                view.map_this(bcr.dialsc[track][subparam].ID, p)
+                view.map_this(dialsc[track][subparam].ID, p)
 
-        i.views.append(view)
+        i.add_view(view)
     # END PER EFFECT VIEW
@@ -1,6 +1,6 @@
 from functools import lru_cache
 from wrapt import synchronized
-from time import time
+from time import monotonic
 from collections import namedtuple
 
 from util import iprint
@@ -53,7 +53,9 @@ class Clock(object):
     @synchronized
     def get_report(self):
         # DELTA
-        now = time()
+        # Float seconds from monotonic() are what the modifiers work with. monotonic_ns
+        # would only have to be converted back, so there's no gain in using it.
+        now = monotonic()
         try:
             delta = now - self.last_report_time
         except TypeError:  # self.last_report_time not set yet
@@ -107,12 +109,16 @@ class Clock(object):
         self.running = True
 
     @synchronized
-    def tick(self):
+    def tick(self, timestamp=None):
+        """
+        Advance by one MIDI clock tick. Provide the time.monotonic() timestamp of when the
+        tick was received so the time spent waiting to get here doesn't skew prog.
+        """
         if self.tick_count == 0:
             self._at_measure_start()
 
         self.tick_count = (self.tick_count + 1) % (self.signature.top * 24 / (self.signature.bottom / 4))
-        self.last_tick_time = time()
+        self.last_tick_time = monotonic() if timestamp is None else timestamp
 
     def _at_measure_start(self):
         print("Measure", self.measure_count, self.signature, self.bpm)
@@ -1,6 +1,5 @@
 import os
 import time
-import json
 
 from threading import Thread
 from queue import Queue, Empty
@@ -10,18 +9,32 @@ from colorama import Fore, Back, Style
 
 from devices.controls import controls_to_IDs
 from util import keys_to_ints, unify, eprint
-from util.threadshell import Shell, yield_thread
+from util.threadshell import Shell, TICK_RATE
+from util.changes import ControlChanges
+from util import jsonio, msgpackio
 from util.attribute_mapping import AttributeType
 
 from targets import get_target, ValueTarget
 from devices import DeviceEvent, OutputEvent
-from modifiers import get_modifier
+from modifiers import get_modifier, Modifier
 
 from .view import View
 from .makers import ParameterMaker, ViewMaker
 from .clock import Clock
 
 
+# Upper bound of queued device events handled in one call to Interface.update
+MAX_EVENTS_PER_UPDATE = 256
+
+# Capacity of the queue of device events. When it is full the devices drop the oldest events
+MAX_QUEUED_EVENTS = 4096
+
+# How far ahead (in seconds) value changes caused by modifiers are scheduled to be
+# reflected on the input device. Changes to the same control within that window
+# are combined into one.
+REFLECT_LOOKAHEAD = 0.005
+
+
 class Interface(object):
     """
     The Interface connects an input device with an output device by tunneling
@@ -48,6 +61,7 @@ class Interface(object):
         self.targets = {}
         self.view = initview if initview else View(self.input, "Init")
         self.views = [self.view]
+        self.views_by_name = {self.view.name: self.view}
 
         # TODO: Make a clock
         self.clock = Clock(self)
@@ -56,23 +70,38 @@ class Interface(object):
         self.event_dispatch = {
             DeviceEvent.CC: self.device_event_callback,
 
-            OutputEvent.CC: self.device_event_callback,
+            OutputEvent.CC: self.from_output,
         }
-        self.device_q = Queue()
+        self.device_q = Queue(maxsize=MAX_QUEUED_EVENTS)
         self.input.add_listener(self.device_q)
         self.output.add_listener(self.device_q)
 
-        self.modifiers = set()
+        # Modifiers in the order they were added (ticked in that order) and by name
+        self.modifiers = []
+        self.modifiers_by_name = {}
 
         self.parameter_maker = ParameterMaker(self, 1)
         self.view_maker = ViewMaker(self)
 
         self.update_thread = None
 
-        self.recent_changes = {}
-        self.reset_recent_changes()
+        # Latest values of the input's controls, kept for whoever polls get_recent_changes
+        self.control_changes = ControlChanges(max(devin.controls, default=-1) + 1)
+
+        # Last known value of each idempotent control on the input (see Control.idempotent).
+        # Setting such a control to the value it already has is skipped unless forced.
+        self.last_control_values = {ID: None for ID, control in devin.controls.items()
+                                    if control.idempotent}
+        # Handed out alternately by get_recent_changes: one is filled while the caller
+        # reads the other
+        self.recent_changes = self.make_recent_changes()
+        self.spare_recent_changes = self.make_recent_changes()
         self.last_modified_targets = set()
 
+        # Control ID -> [due time, value] of reflections scheduled by schedule_reflection,
+        # in the order they are due
+        self.pending_reflections = {}
+
         self.universal_controls = ddict(list)  # AttributeType -> list of IDs
 
         self.snapshots = {}
@@ -139,14 +168,27 @@ class Interface(object):
         
         self.reflect_all_on_input()
 
-    def reset_recent_changes(self):
-        self.recent_changes = {
-            "controls": {},
+    def make_recent_changes(self):
+        return {
+            "controls": self.control_changes,
             "targets": {},
             "views": {"active": self.view,
                       "all": self.views}
         }
 
+    def reset_recent_changes(self):
+        """
+        Swaps in the spare recent changes and clears them
+        """
+        self.control_changes.swap()
+        self.recent_changes, self.spare_recent_changes = self.spare_recent_changes, self.recent_changes
+
+        changes = self.recent_changes
+        changes["targets"].clear()
+        views = changes["views"]
+        views["active"] = self.view
+        views["all"] = self.views
+
     def make_profile(self):
         p = {"input": self.input.name,
              "output": self.output.name,
@@ -160,13 +202,12 @@ class Interface(object):
 
         for view in self.views:
             v = {"name": view.name,
-                 "configuration": view.configuration,
+                 "configuration": view.serialize_configuration(),
                  "map": []} 
 
             m = v["map"]
-            for ID, targets in view.map.items():
-                for target in targets:
-                    m.append(target.serialize(ID))
+            for ID, target in view.mappings():
+                m.append(target.serialize(ID))
             p["views"].append(v)
 
         p["modifiers"] = [m.serialize() for m in self.modifiers]
@@ -186,42 +227,59 @@ class Interface(object):
 
         # Create modifiers
         for m in p["modifiers"]:
-            try:
-                M = get_modifier(m["type"])
-            except KeyError as e:
-                eprint("Mods", e)
-                continue
-            mod = M.blank()
-            mod.from_dict(m, self.targets)
-            self.add_modifier(mod)
+            self.load_modifier(m)
 
         # Create views and their targets
         self.views = []
+        self.views_by_name = {}
         self.view = None
 
         for v in p["views"]:
-            view = View(self.input, v["name"])
-            view.configuration = keys_to_ints(v["configuration"])
-            self.views.append(view)
-            for t in v["map"]:
-                if t["name"] in self.targets:
-                    target = self.targets[t["name"]]
-                else:
-                    try:
-                        T = get_target(t["type"])
-                    except KeyError as e:
-                        eprint("Targets", e)
-                        continue
-                    target = T.blank(self)
-                    target.from_dict(t)
-                    self.add_target(target)
-                view.map_this(t["ID"], target)
+            self.load_view(v)
 
         # activate active view
         self.switch_to_view(p["active_view"])
 
         print("Profile loaded.")
 
+    def load_modifier(self, m):
+        """
+        Creates and adds a modifier from its entry in a profile
+        """
+        try:
+            M = get_modifier(m["type"])
+        except KeyError as e:
+            eprint("Mods", e)
+            return None
+        mod = M.blank()
+        mod.from_dict(m, self.targets)
+        self.add_modifier(mod)
+        return mod
+
+    def load_view(self, v):
+        """
+        Creates a view from its entry in a profile and adds it to the view
+        catalog. Targets that don't exist yet are created along the way.
+        """
+        view = View(self.input, v["name"])
+        view.load_configuration(keys_to_ints(v["configuration"]))
+        self.views.append(view)
+        self.views_by_name[view.name] = view
+        for t in v["map"]:
+            if t["name"] in self.targets:
+                target = self.targets[t["name"]]
+            else:
+                try:
+                    T = get_target(t["type"])
+                except KeyError as e:
+                    eprint("Targets", e)
+                    continue
+                target = T.blank(self)
+                target.from_dict(t)
+                self.add_target(target)
+            view.map_this(t["ID"], target)
+        return view
+
     ########### VIEWS ###############
            
     def add_view(self, view):
@@ -229,12 +287,12 @@ class Interface(object):
         Adds the view to the view list if it isn't already in there.
         Returns True if it is a new view, False if not
         """
-        if view.name not in map(lambda v: v.name, self.views):
-            new_view = True
+        if view.name not in self.views_by_name:
             self.views.append(view)
-            for ID, targets in view.map.items():
-                for target in targets:
-                    self.add_target(target)
+            self.views_by_name[view.name] = view
+            add_target = self.add_target
+            for ID, target in view.mappings():
+                add_target(target)
             return True
         else:
             return False
@@ -247,16 +305,16 @@ class Interface(object):
         """
         if type(view) == str:
             # Find view by name
-            views = list(filter(lambda v: v.name==view, self.views))
-            if len(views) != 1:
+            try:
+                view = self.views_by_name[view]
+            except KeyError:
                 print("View by the name %s not in interface.views" % view)
-                raise KeyError
-            view = views[0]
+                raise
 
-        if self.view and self.view == view:  # Nothing to be done
+        if self.view is view:  # Nothing to be done
             return
 
-        self.view = view
+        previous_view, self.view = self.view, view
 
         for ID, control in self.input.controls.items():
             try:
@@ -267,7 +325,7 @@ class Interface(object):
         if not temp:
             new_view = self.add_view(view)
 
-        self.reflect_all_on_input()
+        self.reflect_all_on_input(previous_view)
         print("[%s] Switched to %s" % (self, view))
 
     ############## TARGETS ################
@@ -277,10 +335,19 @@ class Interface(object):
         Add a configured target. This method checks for duplicates and
         ignores them if detected.
         """
-        if target.name in self.targets:
+        if self.targets.setdefault(target.name, target) is not target:
             print("Target with same name already exists! Ignoring...")
-            return
-        self.targets[target.name] = target
+
+    def output_connection_changed(self, target, old_connection):
+        """
+        Targets call this if the (channel, cc) they are connected to on the
+        output changes, to keep the views' output indices in sync.
+        """
+        views = set(self.views)
+        if self.view is not None:  # The active view might be a temporary one
+            views.add(self.view)
+        for view in views:
+            view.update_output_connection(target, old_connection)
 
     def quick_parameter(self, ID, is_button=False):
         """
@@ -316,11 +383,14 @@ class Interface(object):
 
     def get_recent_changes(self):
         """
-        Returns the dict of recent control value changes and resets it
+        Returns the dict of recent changes and resets it. Control values are
+        provided as a ControlChanges buffer, call drain() on it to consume them.
+
+        The returned dict is reused by the call after next, so be done with it by then.
         """
-        copy = self.recent_changes
+        changes = self.recent_changes
         self.reset_recent_changes()
-        return copy
+        return changes
 
 
     ############## CALLBACKS / EVENT / INPUT HANDLING ################
@@ -331,17 +401,26 @@ class Interface(object):
         messages to consume (input -> hardware -> controls ((, output ->
         daw -> automation)).
         """
-        try:
-            targets = self.view.map[ID]
-        except KeyError:
-            print("No target configured for ID %i" % ID)
+        last_control_values = self.last_control_values
+        if ID in last_control_values:
+            last_control_values[ID] = value
+
+        # Unmapped controls are common (see reflect_all_on_input), nothing to do for them
+        targets = self.view.map.get(ID)
+        if not targets:
             return
 
+        # Triggering a target may switch views, so only bind what stays the same
+        control_changes = self.control_changes
+        reflect_target_on_input = self.reflect_target_on_input
+        exclude_IDs = (ID,)
+
         modified_targets = set()
+        unified = unify(value)
         for target in targets:
             # Some targets should only trigger on certain values
             # TODO: Move this into the target.trigger method?
-            if unify(value) in target.trigger_vals:
+            if (target.trigger_mask >> unified) & 1:
                 real_value = target.trigger(sender, value)
 
                 # We keep a set of last modified targets in the Interface
@@ -355,9 +434,9 @@ class Interface(object):
 
                 if real_value is not None and value != real_value:
                     self._set_control(ID, real_value)
-                else:
-                    self.recent_changes["controls"][ID] = real_value
-                self.reflect_target_on_input(target, exclude_IDs=[ID])
+                elif real_value is not None:
+                    control_changes.set(ID, real_value)
+                reflect_target_on_input(target, exclude_IDs=exclude_IDs)
 
         if modified_targets:
             self.last_modified_targets = modified_targets
@@ -370,20 +449,17 @@ class Interface(object):
         Inform the target and reflect the value on the input device always.
         """
         assert(sender == self.output)
-        # Look for targets connected to the Control ID of the output
-
-        targets = []
-        for target_list in self.view.map.values():
-            for target in target_list:
-                if target.is_connected_to_output(channel, cc):
-                    targets.append(target)
+        # Look up the targets connected to that channel and cc of the output
+        targets = self.view.output_index.get((channel, cc), ())
 
+        reflect_target_on_input = self.reflect_target_on_input
+        unified = unify(value)
         for target in targets:
-            if unify(value) in target.trigger_vals:
+            if (target.trigger_mask >> unified) & 1:
                 # trigger will notify the output again if needed, we don't care
                 target.trigger(sender, value)
                 # but we need to reflect this value change on the input device
-                self.reflect_target_on_input(target)
+                reflect_target_on_input(target)
 
     def target_triggered(self, target, value, sender):
         """
@@ -396,24 +472,85 @@ class Interface(object):
         """
         assert(sender not in (self.input, self.output))
         if value is not None:
-            for ID in self.view.find_IDs_by_target(target):
-                self._set_control(ID, target.value)
+            IDs = self.view.find_IDs_by_target(target)
+            if not IDs:
+                return
+            target_value = target.value
+            if isinstance(sender, Modifier):
+                # Modifiers change their targets on every tick, no need to show each value
+                schedule_reflection = self.schedule_reflection
+                for ID in IDs:
+                    schedule_reflection(ID, target_value)
+            else:
+                set_control = self._set_control
+                for ID in IDs:
+                    set_control(ID, target_value)
+
+    def schedule_reflection(self, ID, value):
+        """
+        Set the control to the value REFLECT_LOOKAHEAD seconds from now (see
+        flush_reflections). Should the control be scheduled again before then,
+        only the latest value is sent.
+        """
+        pending = self.pending_reflections.get(ID)
+        if pending:
+            pending[1] = value
+        else:
+            self.pending_reflections[ID] = [time.monotonic() + REFLECT_LOOKAHEAD, value]
+
+    def flush_reflections(self, now):
+        """
+        Sends all scheduled reflections due by now to the input device
+        """
+        pending = self.pending_reflections
+        due = []
+        for ID, (when, value) in pending.items():
+            if when > now:
+                break
+            due.append((ID, value))
+
+        for ID, _ in due:
+            del pending[ID]
+        self._set_controls(due)
 
     def _set_control(self, ID, value, force=False):
         """
         Sets the control of the input device of the Interface and caches
-        the set value in our recent_changes dict.
+        the set value in our control_changes buffer.
 
         The force flag causes the Controls of the Device to assume a state
         appropriate for that value. E.g.: Toggle buttons might be implemented
         using an ignore state. Using force means "Assume the value and state
         I provide" vs. "I'm trying to set this value, is that okay in your
         current configuration?"
+
+        Unless forced, the call is dropped if the control already has that value.
         """
+        if not force and self.last_control_values.get(ID) == value:
+            return
+
         set_value = self.input.set_control(ID, value, force=force).get()  # Returns a promise
+        self._control_set(ID, set_value)
+
+    def _control_set(self, ID, set_value):
+        if ID in self.last_control_values:
+            self.last_control_values[ID] = set_value
         if set_value is not None:
-            self.recent_changes["controls"][ID] = set_value
-        
+            self.control_changes.set(ID, set_value)
+
+    def _set_controls(self, values, force=False):
+        """
+        Like _set_control for an iterable of (ID, value) pairs. All calls are handed
+        to the input device before waiting on the first result, so its thread works
+        through them in one go instead of one round trip per control.
+        """
+        set_control = self.input.set_control
+        last_values = self.last_control_values
+        promises = [(ID, set_control(ID, value, force=force)) for ID, value in values
+                    if force or last_values.get(ID) != value]
+
+        for ID, promise in promises:
+            self._control_set(ID, promise.get())
 
     def device_event_callback(self, sender, ID, value):
         """
@@ -443,50 +580,62 @@ class Interface(object):
         certain IDs. Only controls mapped to the given target will
         be updated.
         """
-        for ID in self.view.find_IDs_by_target(target):
-            if not exclude_IDs or ID not in exclude_IDs:
-                self._set_control(ID, target.value)
+        self._set_controls((ID, target.value) for ID in self.view.find_IDs_by_target(target)
+                           if not exclude_IDs or ID not in exclude_IDs)
 
-    def reflect_all_on_input(self):
+    def reflect_all_on_input(self, previous_view=None):
         """
-        Based on the current view, reflect all values to the input device
+        Based on the current view, reflect all values to the input device.
+
+        When coming from previous_view, idempotent controls configured the same way
+        in both views are only sent if their value differs from what they show already.
+        Everything else is forced into its new state.
         """
-        untouched = set(self.input.controls.keys())
-        for ID, targets in self.view.map.items():
-            for target in targets:
-                try:
-                    # Does the target have a value type?
-                    getattr(target, "value")
-                except AttributeError:
-                    continue
-                self._set_control(ID, target.value, force=True)
-                try:
-                    untouched.remove(ID)
-                except KeyError:
-                    # IDs can be mapped multiple times
-                    pass
+        # Anything still scheduled was meant for the controls as they were before
+        self.pending_reflections.clear()
+
+        view = self.view
+        values = [(ID, target.value) for ID, target in view.reflect_plan]
+        values.extend((ID, 0) for ID in view.untouched_IDs)
+
+        if previous_view is None:
+            self._set_controls(values, force=True)
+            return
+
+        idempotent = self.last_control_values
+        conf = view.configuration
+        previous_conf = previous_view.configuration
+        forced, unforced = [], []
+        for ID, value in values:
+            if ID in idempotent and conf.get(ID) == previous_conf.get(ID):
+                unforced.append((ID, value))
+            else:
+                forced.append((ID, value))
+        self._set_controls(forced, force=True)
+        self._set_controls(unforced)
 
-        for ID in untouched:
-            self._set_control(ID, 0, force=True)
- 
 
     ############## MODIFIERS ####################
 
 
     def add_modifier(self, modifier):
-        self.modifiers.add(modifier)
+        """
+        Adds the modifier unless one with the same name was added before.
+        Returns True if it is a new modifier, False if not
+        """
+        if modifier.name in self.modifiers_by_name:
+            return False
+        self.modifiers.append(modifier)
+        self.modifiers_by_name[modifier.name] = modifier
+        return True
 
     def remove_modifier(self, modifier):
-        try:
+        if self.modifiers_by_name.get(modifier.name) is modifier:
+            del self.modifiers_by_name[modifier.name]
             self.modifiers.remove(modifier)
-        except KeyError:
-            pass
 
     def get_modifier(self, name):
-        try:
-            return next(filter(lambda m: m.name == name, self.modifiers))
-        except StopIteration:
-            raise KeyError
+        return self.modifiers_by_name[name]
 
     ############## UPDATING ####################
 
@@ -495,34 +644,95 @@ class Interface(object):
         self.update_thread.start()
 
     def main_loop(self):
+        q = self.device_q
+        timeout = TICK_RATE / 1000.
         while True:
+            # Sleep until the next event arrives or it's time to tick the modifiers
+            try:
+                event = q.get(timeout=timeout)
+            except Empty:
+                pass
+            else:
+                self.dispatch_event(*event)
+            # Events and modifiers guard themselves. Anything else failing must not
+            # end the update thread, or the controller silently stops responding
             try:
                 self.update()
             except Exception as e:
-                eprint(e)
-            yield_thread()
+                eprint(self, e)
 
-    def update(self):
-        # Handle DeviceEvent queue
-        max_messages = 50
+    def dispatch_event(self, event, *data):
+        """
+        Hands the event to its handler. A failing handler is reported but doesn't
+        hold up the events after it.
+        """
         try:
-            while max_messages > 0:
-                event, *data = self.device_q.get_nowait()
-                max_messages -= 1
-                try:
-                    func = self.event_dispatch[event]
-                except KeyError:
-                    eprint(self, "Cannot handle event of type", event)
+            # Control changes on the devices are by far the most common event, so they
+            # skip the lookup in event_dispatch
+            if event is DeviceEvent.CC:
+                sender, ID, value = data
+                self.device_event_callback(sender, ID, value)
+                return
+            func = self.event_dispatch.get(event)
+            if func is None:
+                eprint(self, "Cannot handle event of type", event)
+                return
+            func(*data)
+        except Exception as e:
+            eprint(self, e)
+
+    def take_events(self):
+        """
+        Takes the events already waiting in the device queue, at most MAX_EVENTS_PER_UPDATE.
+        Consecutive CC events for the same idempotent control of the input (a dial being
+        turned) are combined into one carrying the latest value. Events are never moved
+        past other events, and button presses are never combined.
+        """
+        q = self.device_q
+        get = q.get_nowait
+        devin = self.input
+        combinable = self.last_control_values
+        events = []
+        last_ID = None  # ID of the last event taken if it can be combined, otherwise None
+        for _ in range(min(q.qsize(), MAX_EVENTS_PER_UPDATE)):
+            item = get()
+            if item[0] is DeviceEvent.CC and item[2] in combinable and item[1] == devin:
+                if item[2] == last_ID:
+                    events[-1] = item
                     continue
-                func(*data)
+                last_ID = item[2]
+            else:
+                last_ID = None
+            events.append(item)
+        return events
 
-        except Empty:
-            pass
+    def update(self):
+        # Handle DeviceEvent queue. Only take what is already waiting so we never block
+        dispatch_event = self.dispatch_event
+        for event in self.take_events():
+            dispatch_event(*event)
+
+        # Without modifiers nobody needs a time report. The clock keeps track of the
+        # time passed since its last report, so skipping reports loses nothing.
+        if self.modifiers:
+            time_report = self.clock.get_report()
+
+            # Targets of several modifiers are triggered once, after all modifiers ticked
+            modified = {}
+            for m in self.modifiers:
+                try:
+                    m.tick(time_report, modified)
+                except Exception as e:
+                    eprint(m, e)
 
-        time_report = self.clock.get_report()
+            for target, modifier in modified.items():
+                try:
+                    target.trigger(modifier)
+                except Exception as e:
+                    eprint(target, e)
 
-        for m in self.modifiers:
-            m.tick(time_report)
+        if self.pending_reflections:
+            self.flush_reflections(time.monotonic())
 
 
     def __repr__(self):
@@ -536,17 +746,29 @@ class Interface(object):
 
 PROFILES_DIR = "profiles"
 PROFILES_EXT = "bcr"
+BINARY_PROFILES_EXT = "bcrb"  # Same content as PROFILES_EXT, encoded with msgpack
 SNAPSHOTS_EXT = "snp"
 
 
 def resolve_profile(name):
     """
-    Find a script in the profiles dir/package by name.
+    Find a script in the profiles dir/package by name. Falls back to a binary
+    profile if there is no regular one.
     """
-    profile_file = os.path.join(PROFILES_DIR, "%s.%s" % (name, PROFILES_EXT))
-    if not os.path.isfile(profile_file):
-        raise FileNotFoundError
-    return profile_file
+    for ext in (PROFILES_EXT, BINARY_PROFILES_EXT):
+        profile_file = os.path.join(PROFILES_DIR, "%s.%s" % (name, ext))
+        if os.path.isfile(profile_file):
+            return profile_file
+    raise FileNotFoundError
+
+
+def profile_codec(filename):
+    """
+    The module to read and write the profile file with, based on its extension
+    """
+    if filename.endswith("." + BINARY_PROFILES_EXT):
+        return msgpackio
+    return jsonio
 
 
 def make_snapshots_file_name(name):
@@ -563,22 +785,22 @@ def resolve_snapshots(name):
 
 def load_snapshots(interface, profile):
     filename = make_snapshots_file_name(profile)
-    with open(filename, "r") as infile:
+    with open(filename, "rb") as infile:
         print("Loading", filename)
-        interface.snapshots = json.load(infile)
+        interface.snapshots = jsonio.load(infile)
         interface.load_snapshot("recall")
 
 def save_snapshots(interface, filename, comment=None):
-    with open(filename, "w") as outfile:
+    with open(filename, "wb") as outfile:
         interface.save_snapshot("recall")
-        json.dump(interface.snapshots, outfile)
+        jsonio.dump(interface.snapshots, outfile)
         print("Saved snapshots to %s" % filename)
 
 
 def load_profile(interface, filename):
-    with open(filename, "r") as infile:
+    with open(filename, "rb") as infile:
         print("Loading", filename)
-        profile = json.load(infile)
+        profile = profile_codec(filename).load(infile)
         interface.load_profile(profile)
         if "comment" in profile:
             for k, v in profile["comment"].items():
@@ -586,9 +808,9 @@ def load_profile(interface, filename):
 
 
 def save_profile(interface, filename, comment=None):
-    with open(filename, "w") as outfile:
+    with open(filename, "wb") as outfile:
         profile = interface.make_profile()
         if comment:
             profile["comment"] = comment
-        json.dump(profile, outfile)
+        profile_codec(filename).dump(profile, outfile)
         print("Saved profile to %s" % filename)
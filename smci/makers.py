@@ -15,11 +15,15 @@ class ParameterMaker(object):
     # These CC values could cause problems when mapped to (in Ableton Live)
     forbidden = [123]
 
+    __slots__ = ("interface", "channel", "next_cc", "prefix", "name_prefix", "expand", "exhausted")
+
     def __init__(self, interface, channel, prefix="CC", first_cc=1, expand=True):
         self.interface = interface
         self.channel = channel
         self.next_cc = first_cc
         self.prefix = prefix
+        # Names are this plus the counter, see make
+        self.name_prefix = prefix + "_"
         self.expand = expand
 
         self.exhausted = False
@@ -28,7 +32,7 @@ class ParameterMaker(object):
         if self.exhausted:
             raise Exhausted
 
-        name = "%s_%i" % (self.prefix, self.next_cc)
+        name = self.name_prefix + str(self.next_cc)
         t = Parameter(name, self.interface, self.channel, self.next_cc, is_button=is_button)        
 
         self.advance()
@@ -58,13 +62,16 @@ class ParameterMaker(object):
 
 class ViewMaker(object):
 
+    __slots__ = ("interface", "next_index", "prefix", "name_prefix")
+
     def __init__(self, interface, prefix="V"):
         self.interface = interface
         self.next_index = 1
         self.prefix = prefix
+        self.name_prefix = prefix + "_"
 
     def make(self, view=None):
-        name = "%s_%i" % (self.prefix, self.next_index)
+        name = self.name_prefix + str(self.next_index)
         if not view:
             view = View(self.interface.input, name=name)
         t = SwitchView(name, self.interface, view)
@@ -1,5 +1,5 @@
 from collections import defaultdict as ddict
-from copy import copy
+from types import MappingProxyType
 
 
 class View(object):
@@ -13,51 +13,185 @@ class View(object):
     values of each mapped target transmitted to that device for it to show those
     values on the hardware.
     """
+    __slots__ = ("name", "configuration", "serialized_configuration", "map", "mapping_pairs",
+                 "target_to_IDs", "connecting_targets", "output_index", "reflect_plan", "untouched_IDs")
+
     def __init__(self, device, name="Unnamed View"):
         # WARNING! The device might be in a threadshell, therefore do not use any of its
         #          methods. Just access attributes. Methods on those attributes are fine though.
         self.name = name
         # Map IDs of a device's controls to configurations:
         # - Buttons: toggle vs momentary
-        self.configuration = {}
-        for ID, control in device.controls.items():
-            self.configuration[ID] = copy(control.default_conf)
+        # The configurations are read-only, change them through configure. Until then,
+        # an ID shares its control's default_conf
+        self.configuration = {ID: control.default_conf for ID, control in device.controls.items()}
+        # Cached result of serialize_configuration, reset by configure
+        self.serialized_configuration = None
+
+        # Map IDs of a device's controls to Targets. The targets per ID are kept as
+        # the keys of a dict (values unused): a set that remembers the mapping order.
+        self.map = ddict(dict)
+        # Cached flat list of all (ID, target) pairs in self.map, see mappings
+        self.mapping_pairs = None
+        # The reverse of self.map: Targets to the IDs mapped to them, again as the keys
+        # of a dict so they come out in mapping order.
+        # Only ever modify both through map_this, unmap and unmap_target.
+        self.target_to_IDs = ddict(dict)
+        # Mapped targets that might be connected to other targets (see Target.connects),
+        # as the keys of a dict in mapping order
+        self.connecting_targets = {}
+        # Mapped targets by the (channel, cc) they are connected to on the output
+        self.output_index = ddict(list)
+
+        # What to send to the device when this view becomes active: (ID, target) for
+        # every mapped target with a value, in mapping order, and the IDs of all the
+        # device's controls without any such target (those are reset to 0)
+        self.reflect_plan = []
+        self.untouched_IDs = set(device.controls)
+
+    def configure(self, ID, **attributes):
+        """
+        Change how the control with the provided ID behaves in this view,
+        e.g. view.configure(ID, toggle=False)
+        """
+        conf = dict(self.configuration[ID])
+        conf.update(attributes)
+        self.configuration[ID] = MappingProxyType(conf)
+        self.serialized_configuration = None
+
+    def configure_all(self, IDs, **attributes):
+        """
+        Like configure, for each of the provided IDs
+        """
+        configuration = self.configuration
+        for ID in IDs:
+            conf = dict(configuration[ID])
+            conf.update(attributes)
+            configuration[ID] = MappingProxyType(conf)
+        self.serialized_configuration = None
 
-        # Map IDs of a device's controls to Targets
-        self.map = ddict(list)
+    def load_configuration(self, configuration):
+        """
+        Takes over the configurations from e.g. a profile, as read-only copies. Those
+        equal to the ID's current configuration keep sharing it.
+        """
+        current = self.configuration
+        for ID, conf in configuration.items():
+            if current.get(ID) != conf:
+                current[ID] = MappingProxyType(dict(conf))
+        self.serialized_configuration = None
+
+    def serialize_configuration(self):
+        """
+        The configuration as plain dicts, e.g. for saving to a profile. Cached until
+        the next call to configure, so don't modify the result.
+        """
+        if self.serialized_configuration is None:
+            self.serialized_configuration = {ID: dict(conf) for ID, conf in self.configuration.items()}
+        return self.serialized_configuration
 
     def find_IDs_by_target(self, vtarget):
         """
-        Make a list of IDs on this view mapped to the provided target.
+        Make a list of IDs on this view mapped to the provided target, in mapping order.
         """
-        IDs = []
-        for ID, vtargets in self.map.items():
-            for target in vtargets:
-                if target == vtarget or target.is_connected_to(vtarget):
-                    IDs.append(ID)
+        IDs = list(self.target_to_IDs.get(vtarget, ()))
+        for target in self.connecting_targets:
+            if target.is_connected_to(vtarget):
+                IDs.extend(self.target_to_IDs[target])
         return IDs
 
+    def mappings(self):
+        """
+        All (ID, target) pairs of the map in a flat list, in the order of the map.
+        Cached until the map changes, so don't modify the result.
+        """
+        if self.mapping_pairs is None:
+            self.mapping_pairs = [(ID, t) for ID, targets in self.map.items() for t in targets]
+        return self.mapping_pairs
+
     def map_this(self, ID, t):
         """
-        Add a mapping from the ID to the target
+        Add a mapping from the ID to the target. Mapping the same pair twice has no effect.
         """
-        self.map[ID].append(t)
+        targets = self.map[ID]
+        if t in targets:
+            return
+        targets[t] = None
+        self.mapping_pairs = None
+        IDs = self.target_to_IDs[t]
+        if not IDs:  # First mapping of this target
+            connection = t.output_connection()
+            if connection is not None:
+                self.output_index[connection].append(t)
+        IDs[ID] = None
+        if t.connects:
+            self.connecting_targets[t] = None
+        if hasattr(t, "value"):
+            self.reflect_plan.append((ID, t))
+            self.untouched_IDs.discard(ID)
 
     def unmap(self, ID):
         """
         Remove all mappings of the provided ID
         """
-        self.map[ID] = []
+        targets = self.map.pop(ID, {})
+        self.mapping_pairs = None
+        for target in targets:
+            IDs = self.target_to_IDs[target]
+            IDs.pop(ID, None)
+            if not IDs:
+                self._forget_target(target)
+
+        if targets:
+            self.reflect_plan = [(i, t) for i, t in self.reflect_plan if i != ID]
+            self._update_untouched((ID,))
 
     def unmap_target(self, target):
         """
         Remove all mappings to the provided target
         """
-        for targets in self.map.values():
-            if target in targets: targets.remove(target) 
+        IDs = self.target_to_IDs.get(target, ())
+        for ID in IDs:
+            self.map[ID].pop(target, None)
+        self.mapping_pairs = None
+
+        if IDs:
+            self.reflect_plan = [(i, t) for i, t in self.reflect_plan if t is not target]
+            self._update_untouched(IDs)
+        self._forget_target(target)
+
+    def _update_untouched(self, IDs):
+        """
+        Marks those of the IDs that no longer have a target to reflect as untouched
+        """
+        reflected = {i for i, _ in self.reflect_plan}
+        self.untouched_IDs.update(ID for ID in IDs if ID not in reflected and ID in self.configuration)
+
+    def update_output_connection(self, target, old_connection):
+        """
+        Call when the output connection of the target changed, to move it in the
+        output index. Ignored if the target isn't mapped on this view.
+        """
+        if target not in self.target_to_IDs:
+            return
+
+        targets = self.output_index.get(old_connection, [])
+        if target in targets:
+            targets.remove(target)
+
+        connection = target.output_connection()
+        if connection is not None:
+            self.output_index[connection].append(target)
+
+    def _forget_target(self, target):
+        self.target_to_IDs.pop(target, None)
+        self.connecting_targets.pop(target, None)
 
-    def __eq__(self, other):
-        return self.name == other.name
+        connection = target.output_connection()
+        if connection is not None:
+            targets = self.output_index.get(connection, [])
+            if target in targets:
+                targets.remove(target)
 
     def __repr__(self):
         return self.name
@@ -29,12 +29,13 @@ class FlexSetter(Target):
             self.flex = self.parent.targets[self.deferred]
             print(">>> Resolved deferred flex link", self, self.flex)
             self.deferred = None
+            self.serialized = None
 
         if value:
             self.flex.link(self.parent.last_modified_targets)
 
-    def serialize(self, *args, **kwargs):
-        s = super().serialize(*args, **kwargs) 
+    def describe(self):
+        s = super().describe()
         s["flex"] = self.flex.name
         return s
 
@@ -56,6 +57,8 @@ class FlexParameter(ValueTarget):
     Forwards all triggers to the linked targets which are set by FlexSetter.
     """
 
+    connects = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.parameters = set()
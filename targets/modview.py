@@ -116,8 +116,7 @@ class ModView(Target):
 
         ID = self.prev_view.find_IDs_by_target(self)[0]
         temp_view.map_this(ID, self)
-        temp_view.configuration[ID]["toggle"] = False
-        temp_view.configuration[ID]["blink"] = True
+        temp_view.configure(ID, toggle=False, blink=True)
 
         # Filter out the ID we mapped to go back from the universal controls
         # so we don't end up stuck in config view or mapping to that ID twice
@@ -160,20 +159,19 @@ class ModView(Target):
         """
         temp_view = View(self.parent.input, name="%s_ModView" % self.modifier)
 
-        for ID, targets in self.prev_view.map.items():
-            for target in targets:
-                if isinstance(target, ValueTarget) and not isinstance(self.parent.input.controls[ID], Button):
-                    try:
-                        mp = self.power_view_targets[target]
-                    except KeyError:
-                        mp = ModPower("%s_%s_PWR" % (target, self.modifier), self.parent, self.modifier, target)
-                        self.power_view_targets[target] = mp
-                    temp_view.map_this(ID, mp)
+        for ID, target in self.prev_view.mappings():
+            if isinstance(target, ValueTarget) and not isinstance(self.parent.input.controls[ID], Button):
+                try:
+                    mp = self.power_view_targets[target]
+                except KeyError:
+                    mp = ModPower("%s_%s_PWR" % (target, self.modifier), self.parent, self.modifier, target)
+                    self.power_view_targets[target] = mp
+                temp_view.map_this(ID, mp)
 
         # Map the button we came here with to get us back
         ID = self.prev_view.find_IDs_by_target(self)[0]
-        temp_view.map[ID].append(self)
-        temp_view.configuration[ID]["toggle"] = False
+        temp_view.map_this(ID, self)
+        temp_view.configure(ID, toggle=False)
 
         return temp_view
 
@@ -227,8 +225,8 @@ class ModView(Target):
         self.in_config_view = False
         self.parent.switch_to_view(self.prev_view)
 
-    def serialize(self, *args, **kwargs):
-        s = super().serialize(*args, **kwargs) 
+    def describe(self):
+        s = super().describe()
         s["modifier"] = self.modifier.name
         return s
 
@@ -241,6 +239,7 @@ class ModView(Target):
             name = self.deferred
         try:
             self.modifier = self.parent.get_modifier(name)
+            self.serialized = None
         except KeyError:
             print("Deferring resolution of modifier", name)
             self.deferred = name
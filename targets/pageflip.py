@@ -13,8 +13,8 @@ class PageFlip(Target):
         super().trigger(sender, value)
         self.device.page = 1 if value >= 64 else 0
 
-    def serialize(self, *args, **kwargs):
-        s = super().serialize(*args, **kwargs) 
+    def describe(self):
+        s = super().describe()
         s["device"] = self.device.name
         return s
 
@@ -12,14 +12,18 @@ class Parameter(ValueTarget):
         self.cc = cc
         self.is_button = is_button
 
-    def serialize(self, *args, **kwargs):
-        s = super(Parameter, self).serialize(*args, **kwargs) 
+    def describe(self):
+        s = super(Parameter, self).describe()
         s["cc"] = self.cc
         s["channel"] = self.channel
-        s["value"] = self.value
         s["is_button"] = self.is_button
         return s
 
+    def serialize(self, ID):
+        s = super(Parameter, self).serialize(ID)
+        s["value"] = self.value
+        return s
+
     def trigger(self, sender, value=None):
         """
         Forwards the value to the configured (output) Device with
@@ -52,8 +56,11 @@ class Parameter(ValueTarget):
 
     def from_dict(self, d):
         super(Parameter, self).from_dict(d)
+        old_connection = self.output_connection()
         self.channel = d["channel"]
         self.cc = d["cc"]
+        if self.output_connection() != old_connection:
+            self.parent.output_connection_changed(self, old_connection)
         self.value = d["value"]
         self.is_button = d["is_button"]
 
@@ -61,7 +68,7 @@ class Parameter(ValueTarget):
     def blank(cls, parent):
         return cls("unnamed", parent, 1, 0)
 
-    def is_connected_to_output(self, channel, cc):
-        return channel == self.channel and cc == self.cc
+    def output_connection(self):
+        return self.channel, self.cc
 
 
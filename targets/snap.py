@@ -34,6 +34,7 @@ class SnapshotButton(Target):
         if self.deferred:
             self.selector = self.parent.targets[d[self.deferred]]
             self.deferred = None
+            self.serialized = None
 
         if value is 127:
             self.down = time()
@@ -45,8 +46,8 @@ class SnapshotButton(Target):
             else:
                 self.selector.issue_save()
 
-    def serialize(self, *args, **kwargs):
-        s = super().serialize(*args, **kwargs) 
+    def describe(self):
+        s = super().describe()
         s["selector"] = self.selector.name
         return s
 
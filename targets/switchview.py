@@ -19,8 +19,8 @@ class SwitchView(Target):
         super().trigger(sender, value)
         self.parent.switch_to_view(self.view_name)
 
-    def serialize(self, *args, **kwargs):
-        s = super(SwitchView, self).serialize(*args, **kwargs) 
+    def describe(self):
+        s = super(SwitchView, self).describe()
         s["view"] = self.view_name
         return s
 
@@ -1,6 +1,6 @@
-from collections import defaultdict as ddict
+import sys
 
-from util import FULL, clip, unify, dprint, iprint
+from util import FULL, clip, unify, dprint, iprint, bitmask
 
 class Target(object):
     """
@@ -10,9 +10,18 @@ class Target(object):
 
     trigger_vals = list(range(128))
 
+    # Set to True if is_connected_to can ever report a connection. Views only
+    # ask those targets when looking up which IDs a target is mapped to.
+    connects = False
+
     def __init__(self, name, parent):
-        self.name = name
+        # Names are used as keys all over the place (targets, snapshots, profiles)
+        self.name = sys.intern(name)
         self.parent = parent
+        # trigger_vals as a bitmask, test with (trigger_mask >> value) & 1
+        self.trigger_mask = bitmask(self.trigger_vals)
+        # Cached result of describe, see serialize
+        self.serialized = None
 
     def trigger(self, sender, value=None):
         """
@@ -26,13 +35,28 @@ class Target(object):
             self.parent.target_triggered(self, value, sender)
 
     def serialize(self, ID):
+        """
+        Describes the target, mapped to the given ID, for a profile. What describe
+        returns is cached until from_dict is called (or the cache is reset by setting
+        self.serialized to None), so override this only to add values that keep changing.
+        """
+        if self.serialized is None:
+            self.serialized = self.describe()
+        s = dict(self.serialized)
+        s["ID"] = ID
+        return s
+
+    def describe(self):
+        """
+        Override to add the attributes needed to recreate the target with from_dict
+        """
         return {"name": self.name,
                 "type": type(self).__name__,
-                "ID": ID,
                 }
 
     def from_dict(self, d):
-        self.name = d["name"]
+        self.name = sys.intern(d["name"])
+        self.serialized = None
 
     # @Robustness: Most of the overrides of this method are trivial, find
     #              a way to have them happen automatically?
@@ -40,8 +64,15 @@ class Target(object):
     def blank(cls, parent):
         return cls("unnamed", parent)
 
-    def is_connected_to_output(self, ID):
-        return False
+    def output_connection(self):
+        """
+        Returns the (channel, cc) combination on the output this target sends to
+        and listens on. None if the target isn't connected to the output.
+        """
+        return None
+
+    def is_connected_to_output(self, channel, cc):
+        return self.output_connection() == (channel, cc)
 
     def is_connected_to(self, target):
         return False
@@ -79,13 +110,16 @@ class ValueTarget(Target):
         self._value = initial  # This is the 'center' value
         self.minimum = minimum
         self.maximum = maximum
-        self.modifiers = ddict(lambda: 0.0)  # object_name -> float
+        self.modifiers = {}  # object_name -> float
 
-    def modify(self, modifier, value):
+    def modify(self, modifier, value, trigger=True):
         """
+        Sets the modifier's contribution to our value. With trigger=False the caller
+        is responsible for triggering us afterwards, e.g. once after all modifiers ticked.
         """
         self.modifiers[modifier.name] = value
-        self.trigger(modifier)
+        if trigger:
+            self.trigger(modifier)
 
     def remove_modifier(self, modifier):
         """
@@ -126,10 +160,10 @@ class ValueTarget(Target):
         # TODO: Annotate which attributes to save and load in Class list
         return {
             "_value": self._value,
-            "modifiers": self.modifiers,
+            "modifiers": dict(self.modifiers),
         }
 
     def load(self, d):
         super().load(d)
         self._value = d["_value"]
-        self.modifiers = ddict(lambda: 0.0, d["modifiers"])
+        self.modifiers = dict(d["modifiers"])
@@ -0,0 +1,44 @@
+"""
+The ControlChanges buffer the Interface hands to the editor.
+"""
+import unittest
+
+from util.changes import ControlChanges
+
+
+class TestControlChanges(unittest.TestCase):
+
+    def test_set_and_drain(self):
+        changes = ControlChanges(20)
+        changes.set(3, 10)
+        changes.set(17, 64)
+        changes.set(3, 20)  # Only the latest value per ID is kept
+        changes.swap()
+        self.assertEqual(list(changes.drain()), [(3, 20), (17, 64)])
+        # Drained IDs are unmarked
+        self.assertEqual(list(changes.drain()), [])
+
+    def test_swap(self):
+        changes = ControlChanges(20)
+        changes.set(1, 1)
+        changes.swap()
+        # Recorded after the swap: not drained until the next one
+        changes.set(2, 2)
+        self.assertEqual(list(changes.drain()), [(1, 1)])
+        changes.swap()
+        self.assertEqual(list(changes.drain()), [(2, 2)])
+        changes.swap()
+        self.assertEqual(list(changes.drain()), [])
+
+    def test_out_of_range(self):
+        changes = ControlChanges(8)
+        changes.set(0, 64.7)
+        changes.set(1, -5)
+        changes.set(2, 300)
+        changes.set(3, None)
+        changes.swap()
+        self.assertEqual(list(changes.drain()), [(0, 64), (1, 0), (2, 127)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+The Interface between a BCR2k and the DAW, without any MIDI hardware.
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    import devices
+    from devices import BCR2k, VirtualMidi
+    from devices.ports import DeviceEvent
+    from smci import Interface
+    from smci.interface import load_profile, save_profile, PROFILES_EXT, BINARY_PROFILES_EXT
+    from rtmidi.midiconstants import CONTROL_CHANGE
+except ImportError:  # python-rtmidi or colorama is not installed
+    devices = None
+
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fake_port(name, inout):
+    port = mock.MagicMock()
+    port.get_message.return_value = None
+    return port, name
+
+
+@unittest.skipIf(devices is None, "python-rtmidi not available")
+class TestInterface(unittest.TestCase):
+
+    def make_interface(self):
+        with mock.patch("devices.bcr2k.open_port_by_name", fake_port), \
+             mock.patch("devices.virtualmidi.open_port_by_name", fake_port):
+            bcr = BCR2k(auto_start=False)
+            loop = VirtualMidi(auto_start=False)
+        interface = Interface(bcr, loop, auto_start=False)
+        # The shells add the interface as a listener in their own threads. Any blocking
+        # call on them returns only after that happened.
+        interface.input.update().get()
+        interface.output.update().get()
+        return interface, bcr, loop
+
+    def test_take_events(self):
+        interface, bcr, loop = self.make_interface()
+        dial, other_dial = bcr.macros[0].ID, bcr.macros[1].ID
+        button = bcr.macro_buttons[0].ID
+
+        events = [
+            (DeviceEvent.CC, bcr, dial, 1),
+            (DeviceEvent.CC, bcr, dial, 2),
+            (DeviceEvent.CC, bcr, dial, 3),          # Combined with the two before
+            (DeviceEvent.CC, bcr, button, 127),
+            (DeviceEvent.CC, bcr, button, 0),        # Presses and releases are all kept
+            (DeviceEvent.CC, bcr, button, 127),
+            (DeviceEvent.CC, bcr, dial, 4),          # Not combined across the button
+            (DeviceEvent.CC, bcr, other_dial, 5),
+            (DeviceEvent.CC, bcr, dial, 6),          # Not combined across another dial
+            (DeviceEvent.CC, bcr, dial, 7),
+        ]
+        for event in events:
+            interface.device_q.put(event)
+
+        self.assertEqual(interface.take_events(), [
+            (DeviceEvent.CC, bcr, dial, 3),
+            (DeviceEvent.CC, bcr, button, 127),
+            (DeviceEvent.CC, bcr, button, 0),
+            (DeviceEvent.CC, bcr, button, 127),
+            (DeviceEvent.CC, bcr, dial, 4),
+            (DeviceEvent.CC, bcr, other_dial, 5),
+            (DeviceEvent.CC, bcr, dial, 7),
+        ])
+        self.assertTrue(interface.device_q.empty())
+
+    def test_output_reflected_on_input(self):
+        interface, bcr, loop = self.make_interface()
+        dial, other_dial = bcr.macros[0], bcr.macros[1]
+        parameter = interface.quick_parameter(dial.ID)
+        channel, cc = parameter.output_connection()
+
+        # The DAW only gets heard on CCs we sent to before
+        loop.cc(channel, cc, 0)
+        loop.cc(channel, cc + 1, 0)
+        loop.input_callback(([CONTROL_CHANGE | (channel - 1), cc, 99], 0.0))
+        loop.input_callback(([CONTROL_CHANGE | (channel - 1), cc + 1, 42], 0.0))
+        interface.update()
+
+        self.assertEqual(parameter.value, 99)
+        self.assertEqual(dial.get_value(), 99)
+        self.assertEqual(other_dial.get_value(), 0)
+
+    def check_profile_round_trip(self, ext):
+        interface, _, _ = self.make_interface()
+        load_profile(interface, os.path.join(ROOT, "profiles", "echolox.%s" % PROFILES_EXT))
+        profile = interface.make_profile()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "profile.%s" % ext)
+            save_profile(interface, filename)
+            reloaded, _, _ = self.make_interface()
+            load_profile(reloaded, filename)
+
+        self.assertEqual(reloaded.make_profile(), profile)
+
+    def test_profile_round_trip(self):
+        self.check_profile_round_trip(PROFILES_EXT)
+
+    @unittest.skipIf(msgpack is None, "msgpack not available")
+    def test_binary_profile_round_trip(self):
+        self.check_profile_round_trip(BINARY_PROFILES_EXT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Smoke test for main.py: loads the echolox profile without any MIDI hardware and
+runs the non-interactive loop for a few ticks.
+"""
+import os
+import runpy
+import sys
+import threading
+import unittest
+from unittest import mock
+
+from util import threadshell
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import devices
+except ImportError:  # python-rtmidi is not installed
+    devices = None
+
+
+def fake_port(name, inout):
+    port = mock.MagicMock()
+    port.get_message.return_value = None
+    return port, name
+
+
+@unittest.skipIf(devices is None, "python-rtmidi not available")
+class TestMain(unittest.TestCase):
+
+    def test_non_interactive(self):
+        ticks = []
+        tick = threadshell.yield_thread
+
+        def yield_thread():
+            """
+            The Shells yield through the same function, only main.py's loop is interrupted.
+            """
+            if threading.current_thread() is threading.main_thread():
+                ticks.append(None)
+                if len(ticks) == 3:
+                    raise KeyboardInterrupt
+            tick()
+
+        cwd = os.getcwd()
+        os.chdir(ROOT)
+        try:
+            with mock.patch.object(sys, "argv", ["main.py", "echolox"]), \
+                 mock.patch("devices.bcr2k.open_port_by_name", fake_port), \
+                 mock.patch("devices.virtualmidi.open_port_by_name", fake_port), \
+                 mock.patch("util.threadshell.yield_thread", yield_thread), \
+                 mock.patch("smci.interface.save_snapshots") as save_snapshots:
+                with self.assertRaises(SystemExit):
+                    runpy.run_path(os.path.join(ROOT, "main.py"), run_name="__main__")
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(len(ticks), 3)
+        save_snapshots.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Configuring controls on a View, for views created in code and loaded from a profile.
+"""
+import unittest
+from types import SimpleNamespace
+
+from util import keys_to_ints
+
+try:
+    from smci.view import View
+    from devices.controls import Button, Dial
+except ImportError:  # colorama or python-rtmidi is not installed
+    View = None
+
+
+@unittest.skipIf(View is None, "smci dependencies not available")
+class TestViewConfiguration(unittest.TestCase):
+
+    def setUp(self):
+        self.device = SimpleNamespace(controls={})
+        self.device.controls[1] = Button(1, self.device)
+        self.device.controls[2] = Dial(2, self.device)
+
+    def loaded_view(self):
+        """
+        A view set up like Interface.load_view does, from its saved (JSON) form
+        """
+        saved = View(self.device, "Saved")
+        saved.configure(1, toggle=False)
+        entry = {str(ID): conf for ID, conf in saved.serialize_configuration().items()}
+        view = View(self.device, "Loaded")
+        view.load_configuration(keys_to_ints(entry))
+        return view
+
+    def check_configure(self, view):
+        self.assertEqual(view.serialize_configuration()[1]["blink"], False)
+
+        with self.assertRaises(TypeError):
+            view.configuration[1]["blink"] = True
+
+        view.configure(1, blink=True)
+        self.assertTrue(view.configuration[1]["blink"])
+        self.assertTrue(view.serialize_configuration()[1]["blink"])
+        # Other views sharing the control's default configuration are unaffected
+        self.assertFalse(Button.default_conf["blink"])
+        self.assertFalse(View(self.device).configuration[1]["blink"])
+
+    def test_fresh_view(self):
+        view = View(self.device)
+        self.assertIs(view.configuration[2], Dial.default_conf)
+        self.check_configure(view)
+        self.assertTrue(view.configuration[1]["toggle"])
+
+    def test_loaded_view(self):
+        view = self.loaded_view()
+        # Unchanged configurations are shared like on a fresh view
+        self.assertIs(view.configuration[2], Dial.default_conf)
+        self.check_configure(view)
+        self.assertFalse(view.configuration[1]["toggle"])
+
+        with self.assertRaises(TypeError):
+            view.configuration[1]["toggle"] = True
+
+
+if __name__ == "__main__":
+    unittest.main()
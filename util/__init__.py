@@ -1,5 +1,6 @@
 import sys
 import code
+from itertools import chain
 
 FULL = 127
 
@@ -7,7 +8,7 @@ def flatten(l):
     """
     Flattens a list of list into a single list
     """
-    return [item for sublist in l for item in sublist]
+    return list(chain.from_iterable(l))
 
 
 def clip(minval, maxval, value):
@@ -19,11 +20,27 @@ def clip(minval, maxval, value):
 
 def keys_to_ints(d):
     """
-    Takes a dict and returns the same dict with all keys converted to ints
+    Takes a dict and returns the same dict with all keys converted to ints.
+    If the keys already are ints (e.g. decoded from msgpack) d itself is returned.
     """
+    if all(type(k) is int for k in d):
+        return d
     return {int(k): v for k, v in d.items()}
 
 
+def bitmask(values):
+    """
+    Turns an iterable of non-negative ints into an int with those bits set.
+    Test for a value v with (mask >> v) & 1
+    >>> bitmask([0, 2])
+    5
+    """
+    mask = 0
+    for value in values:
+        mask |= 1 << value
+    return mask
+
+
 def unify(value):
     """
     Converts the value to a number from 0 to 127.
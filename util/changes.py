@@ -0,0 +1,61 @@
+"""
+Provides a buffer (ControlChanges) that collects the latest value per control ID
+between two polls, e.g. for an editor that periodically displays what changed.
+
+Values are kept in a flat array of MIDI values (0 to 127) indexed by ID and a bitmap
+marks which IDs changed since the last poll. Recording a change never allocates, no
+matter how often the producer writes between two polls.
+
+There are two bitmaps: the producer marks changes in one while the consumer drains
+the other. swap exchanges them and is called by the producer's thread whenever it
+hands the changes to the consumer, so no change is lost to a concurrent drain.
+"""
+from array import array
+
+from util import clip
+
+
+class ControlChanges(object):
+    """
+    Latest value per control ID plus a bitmap of the IDs that changed since
+    the last call to swap.
+    """
+    __slots__ = ("values", "dirty", "pending")
+
+    def __init__(self, size):
+        self.values = array("B", bytes(size))
+        self.dirty = bytearray((size + 7) // 8)
+        self.pending = bytearray((size + 7) // 8)
+
+    def set(self, ID, value):
+        """
+        Records the value for the control ID and marks it as changed. The value is
+        turned into an int and clipped to 0..127, None is ignored.
+        """
+        if value is None:
+            return
+        self.values[ID] = clip(0, 127, int(value))
+        self.dirty[ID >> 3] |= 1 << (ID & 7)
+
+    def swap(self):
+        """
+        Hands the changes recorded so far over to drain and starts recording
+        into the bitmap drain emptied last time
+        """
+        self.dirty, self.pending = self.pending, self.dirty
+
+    def drain(self):
+        """
+        Yields (ID, value) for every control that changed before the last call
+        to swap and unmarks them.
+        """
+        values = self.values
+        dirty = self.pending
+        for byte_index, byte in enumerate(dirty):
+            if not byte:
+                continue
+            dirty[byte_index] = 0
+            for bit in range(8):
+                if byte & (1 << bit):
+                    ID = (byte_index << 3) | bit
+                    yield ID, values[ID]
@@ -0,0 +1,44 @@
+"""
+JSON encoding and decoding for profiles and snapshots.
+
+Uses orjson if it is installed, which is a lot faster on large profiles, and
+falls back to the standard library's json module otherwise. Both produce the
+same documents: non-string keys (e.g. control IDs) are written as strings.
+"""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def dumps(obj):
+    """
+    Encodes the object as JSON and returns the result as bytes
+    """
+    if orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode("utf-8")
+
+
+def loads(data):
+    """
+    Decodes a JSON document provided as bytes or str
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump(obj, outfile):
+    """
+    Writes the object as JSON to a file opened in binary mode
+    """
+    outfile.write(dumps(obj))
+
+
+def load(infile):
+    """
+    Reads a JSON document from a file opened in binary mode
+    """
+    return loads(infile.read())
@@ -0,0 +1,31 @@
+"""
+MessagePack encoding and decoding for binary profiles (see smci.interface.BINARY_PROFILES_EXT).
+
+msgpack is an optional dependency, only needed to read or write binary profiles.
+Unlike JSON, integer keys like control IDs are kept as integers.
+"""
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise ImportError("Binary profiles need the msgpack package: pip install msgpack")
+
+
+def dump(obj, outfile):
+    """
+    Writes the object as MessagePack to a file opened in binary mode
+    """
+    _require_msgpack()
+    outfile.write(msgpack.packb(obj, use_bin_type=True))
+
+
+def load(infile):
+    """
+    Reads a MessagePack document from a file opened in binary mode
+    """
+    _require_msgpack()
+    return msgpack.unpackb(infile.read(), raw=False, strict_map_key=False)